@@ -1,7 +1,7 @@
 import { spawn } from "node:child_process";
 import { dirname, resolve } from "node:path";
 import { fileURLToPath } from "node:url";
-import { copyToVault } from "./copy-to-vault.mjs";
+import { copyToVault, parseCopyOptions } from "./copy-to-vault.mjs";
 
 const scriptDir = dirname(fileURLToPath(import.meta.url));
 const pluginDir = resolve(scriptDir, "..");
@@ -33,11 +33,14 @@ function runProductionBuild() {
 }
 
 try {
+	const copyOptions = parseCopyOptions();
 	console.log("[formify] Starting production build...");
 	await runProductionBuild();
 	console.log("[formify] Build finished. Syncing files to Obsidian vault...");
-	await copyToVault();
-	console.log("[formify] Build + sync completed.");
+	const { copiedFiles, skippedFiles, copiedBytes } = await copyToVault(copyOptions);
+	console.log(
+		`[formify] Build + sync completed (${copiedFiles.length} copied, ${skippedFiles.length} unchanged, ${copiedBytes} bytes written).`
+	);
 } catch (error) {
 	console.error(`[formify] Build + sync failed: ${error.message}`);
 	process.exit(1);
@@ -1,7 +1,8 @@
-import { access, copyFile, mkdir, readFile, unlink, rename } from "node:fs/promises";
-import { existsSync } from "node:fs";
+import { copyFile, mkdir, readFile, unlink, rename, stat, utimes } from "node:fs/promises";
+import { constants as fsConstants, existsSync } from "node:fs";
 import { dirname, join, resolve } from "node:path";
 import { fileURLToPath } from "node:url";
+import { parseArgs } from "node:util";
 import dotenv from "dotenv";
 
 const scriptDir = dirname(fileURLToPath(import.meta.url));
@@ -9,8 +10,19 @@ const pluginDir = resolve(scriptDir, "..");
 const repoRootDir = resolve(pluginDir, "..");
 const ENV_KEY = "OBSIDIAN_VAULT_PATH";
 
-const requiredBuildFiles = ["main.js"];
-const optionalBuildFiles = ["styles.css", "versions.json"];
+// 构建产物及 manifest 的候选路径在模块加载时解析一次，之后只读复用
+const describeBuildFile = (name, required) =>
+	Object.freeze({ name, sourcePath: resolve(pluginDir, name), required });
+const requiredBuildFiles = Object.freeze(["main.js"].map((name) => describeBuildFile(name, true)));
+const optionalBuildFiles = Object.freeze(
+	["styles.css", "versions.json"].map((name) => describeBuildFile(name, false))
+);
+const manifestCandidates = Object.freeze([
+	resolve(pluginDir, "manifest.json"),
+	resolve(repoRootDir, "manifest.json")
+]);
+// 小于该阈值且大小相同的文件会逐字节比较内容，以识别重新构建但内容未变的产物
+const CONTENT_COMPARE_MAX_BYTES = 1024 * 1024;
 
 function loadEnvFiles() {
 	const envCandidates = [resolve(pluginDir, ".env"), resolve(repoRootDir, ".env")];
@@ -22,60 +34,122 @@ function loadEnvFiles() {
 	}
 }
 
-async function pathExists(filePath) {
+/**
+ * 读取文件元数据，文件不存在时返回 null
+ * 一次 stat 同时完成存在性检查与大小等信息获取
+ */
+async function statIfExists(filePath) {
 	try {
-		await access(filePath);
+		return await stat(filePath);
+	} catch (error) {
+		if (error.code === "ENOENT") {
+			return null;
+		}
+		throw error;
+	}
+}
+
+/**
+ * 快速复制文件：优先尝试写时复制（reflink），不支持时由 libuv 回退到
+ * copy_file_range / sendfile 等内核态零拷贝路径，避免经由用户态缓冲区搬运字节
+ * 复制后同步源文件的访问/修改时间，供下次同步判断文件是否变化
+ */
+async function fastCopyFile(sourcePath, targetPath, sourceStat) {
+	await copyFile(sourcePath, targetPath, fsConstants.COPYFILE_FICLONE);
+	await utimes(targetPath, sourceStat.atimeMs / 1000, sourceStat.mtimeMs / 1000);
+}
+
+/**
+ * 判断源文件与目标文件是否为同一文件（例如插件目录通过符号链接或目录联接挂载到 Vault）
+ * 先用已获取的 stat 结果粗筛；NTFS 文件 ID 可能超过 2^53，数值型 inode 会丢失低位，
+ * 因此粗筛命中后再以 bigint 精度重新比较设备号与 inode
+ */
+export async function isSameFile(sourcePath, sourceStat, targetPath, targetStat) {
+	if (!targetStat
+		|| sourceStat.ino === 0
+		|| targetStat.dev !== sourceStat.dev
+		|| targetStat.ino !== sourceStat.ino) {
+		return false;
+	}
+	const [exactSourceStat, exactTargetStat] = await Promise.all([
+		stat(sourcePath, { bigint: true }),
+		stat(targetPath, { bigint: true })
+	]);
+	return exactSourceStat.ino !== 0n
+		&& exactTargetStat.dev === exactSourceStat.dev
+		&& exactTargetStat.ino === exactSourceStat.ino;
+}
+
+/**
+ * 比较修改时间；不同文件系统的时间戳精度不同，容忍 1ms 以内的误差
+ */
+function hasSameMtime(sourceStat, targetStat) {
+	return Math.abs(targetStat.mtimeMs - sourceStat.mtimeMs) < 1;
+}
+
+/**
+ * 判断目标文件是否与源文件一致，一致时无需重新复制
+ * 先比较大小与修改时间；小文件在修改时间不同但大小相同时再比较内容
+ * 只做判断、不修改目标文件
+ */
+export async function isTargetUpToDate(sourcePath, sourceStat, targetPath, targetStat) {
+	if (!targetStat || targetStat.size !== sourceStat.size) {
+		return false;
+	}
+	if (hasSameMtime(sourceStat, targetStat)) {
 		return true;
-	} catch {
+	}
+	if (sourceStat.size > CONTENT_COMPARE_MAX_BYTES) {
 		return false;
 	}
+	const [sourceContent, targetContent] = await Promise.all([
+		readFile(sourcePath),
+		readFile(targetPath)
+	]);
+	return sourceContent.equals(targetContent);
 }
 
 /**
  * 带重试机制的文件复制函数
- * 在 Windows 上处理文件被锁定的问题（EBUSY 错误）
+ * 在 Windows 上处理文件被锁定的问题（EBUSY/EPERM 错误）
+ * 先复制到临时文件再整体替换，重试期间从不删除目标文件，读取方只会看到旧文件或新文件
  */
-async function copyFileWithRetry(sourcePath, targetPath, maxRetries = 5, delayMs = 200) {
+async function copyFileWithRetry(sourcePath, targetPath, sourceStat, maxRetries = 5, delayMs = 200) {
+	const tempPath = `${targetPath}.tmp`;
+	let tempReady = false;
 	for (let attempt = 0; attempt < maxRetries; attempt++) {
 		try {
-			// 先尝试删除目标文件（如果存在），避免覆盖时的锁定问题
-			try {
-				await unlink(targetPath);
-			} catch {
-				// 目标文件不存在或无法删除，继续尝试复制
+			if (!tempReady) {
+				await fastCopyFile(sourcePath, tempPath, sourceStat);
+				tempReady = true;
 			}
-			// 使用临时文件进行复制
-			const tempPath = `${targetPath}.tmp`;
-			await copyFile(sourcePath, tempPath);
 			await rename(tempPath, targetPath);
 			return;
 		} catch (error) {
-			if (error.code === 'EBUSY' || error.code === 'EPERM') {
-				if (attempt < maxRetries - 1) {
-					// 等待后重试
-					await new Promise(resolve => setTimeout(resolve, delayMs * (attempt + 1)));
-					continue;
-				}
+			if ((error.code === 'EBUSY' || error.code === 'EPERM') && attempt < maxRetries - 1) {
+				// 等待锁释放后重试（临时文件已就绪时只重试替换）
+				await new Promise(resolve => setTimeout(resolve, delayMs * (attempt + 1)));
+				continue;
 			}
+			await unlink(tempPath).catch(() => undefined);
 			throw error;
 		}
 	}
 }
 
-async function resolveManifestPath() {
-	const candidates = [
-		resolve(pluginDir, "manifest.json"),
-		resolve(repoRootDir, "manifest.json")
-	];
-
-	for (const candidate of candidates) {
-		if (await pathExists(candidate)) {
-			return candidate;
+/**
+ * 查找 manifest.json，返回其路径与 stat 结果，供后续同步复用而无需再次 stat
+ */
+async function resolveManifest() {
+	for (const candidate of manifestCandidates) {
+		const manifestStat = await statIfExists(candidate);
+		if (manifestStat) {
+			return { manifestPath: candidate, manifestStat };
 		}
 	}
 
 	throw new Error(
-		`[formify] 未找到 manifest.json。已检查: ${candidates.join(", ")}`
+		`[formify] 未找到 manifest.json。已检查: ${manifestCandidates.join(", ")}`
 	);
 }
 
@@ -88,27 +162,50 @@ async function readPluginId(manifestPath) {
 	return manifest.id;
 }
 
-async function resolveFilesToCopy(manifestPath) {
-	const files = [
-		{ name: "main.js", sourcePath: resolve(pluginDir, "main.js"), required: true },
-		{ name: "manifest.json", sourcePath: manifestPath, required: true }
-	];
-
-	for (const name of optionalBuildFiles) {
-		const sourcePath = resolve(pluginDir, name);
-		if (await pathExists(sourcePath)) {
-			files.push({ name, sourcePath, required: false });
+async function resolveBuildFiles(candidates) {
+	const files = [];
+	for (const candidate of candidates) {
+		const sourceStat = await statIfExists(candidate.sourcePath);
+		if (sourceStat) {
+			files.push({ ...candidate, sourceStat });
+			continue;
+		}
+		if (candidate.required) {
+			throw new Error(`[formify] 缺少构建产物: ${candidate.sourcePath}。请先运行构建命令。`);
 		}
 	}
+	return files;
+}
 
-	for (const name of requiredBuildFiles) {
-		const sourcePath = resolve(pluginDir, name);
-		if (!(await pathExists(sourcePath))) {
-			throw new Error(`[formify] 缺少构建产物: ${sourcePath}。请先运行构建命令。`);
+async function resolveFilesToCopy({ manifestPath, manifestStat }) {
+	return [
+		...(await resolveBuildFiles(requiredBuildFiles)),
+		{ name: "manifest.json", sourcePath: manifestPath, required: true, sourceStat: manifestStat },
+		...(await resolveBuildFiles(optionalBuildFiles))
+	];
+}
+
+/**
+ * 将单个构建产物同步到插件目录，目标已是最新或与源文件为同一文件时跳过复制
+ * setTimestamps 用于写回时间戳，默认为 fs.utimes
+ */
+export async function syncBuildFile(file, targetPluginDir, force = false, setTimestamps = utimes) {
+	const targetPath = join(targetPluginDir, file.name);
+	const targetStat = await statIfExists(targetPath);
+	if (await isSameFile(file.sourcePath, file.sourceStat, targetPath, targetStat)) {
+		return { name: file.name, copied: false, size: file.sourceStat.size };
+	}
+	if (!force && (await isTargetUpToDate(file.sourcePath, file.sourceStat, targetPath, targetStat))) {
+		if (!hasSameMtime(file.sourceStat, targetStat)) {
+			// 内容一致但时间戳不同：尽力写回时间戳，后续同步可直接通过大小与修改时间判断；
+			// 写回失败（如 Windows 上文件被锁定）不影响“未变化”的结论
+			await setTimestamps(targetPath, file.sourceStat.atimeMs / 1000, file.sourceStat.mtimeMs / 1000)
+				.catch(() => undefined);
 		}
+		return { name: file.name, copied: false, size: file.sourceStat.size };
 	}
-
-	return files;
+	await copyFileWithRetry(file.sourcePath, targetPath, file.sourceStat);
+	return { name: file.name, copied: true, size: file.sourceStat.size };
 }
 
 export async function copyToVault(options = {}) {
@@ -122,41 +219,66 @@ export async function copyToVault(options = {}) {
 		);
 	}
 
-	const manifestPath = await resolveManifestPath();
-	const pluginId = await readPluginId(manifestPath);
+	const manifest = await resolveManifest();
+	const pluginId = await readPluginId(manifest.manifestPath);
 	const sourceDir = pluginDir;
 	const targetPluginDir = resolve(vaultRoot, ".obsidian", "plugins", pluginId);
-	const filesToCopy = await resolveFilesToCopy(manifestPath);
+	const filesToCopy = await resolveFilesToCopy(manifest);
 
 	await mkdir(targetPluginDir, { recursive: true });
 
-	const copiedFiles = [];
-	for (const file of filesToCopy) {
-		const targetPath = join(targetPluginDir, file.name);
-		await copyFileWithRetry(file.sourcePath, targetPath);
-		copiedFiles.push(file.name);
-	}
+	// 各文件的复制互不依赖，并发执行以重叠 I/O 等待
+	const results = await Promise.all(
+		filesToCopy.map((file) => syncBuildFile(file, targetPluginDir, options.force))
+	);
+	const copiedFiles = results.filter((result) => result.copied).map((result) => result.name);
+	const skippedFiles = results.filter((result) => !result.copied).map((result) => result.name);
+	const copiedBytes = results.reduce((total, result) => (result.copied ? total + result.size : total), 0);
 
-	console.log(`[formify] Source: ${sourceDir}`);
-	console.log(`[formify] Vault: ${vaultRoot}`);
-	console.log(`[formify] Plugin id: ${pluginId}`);
-	console.log(`[formify] Target: ${targetPluginDir}`);
-	console.log(`[formify] Copy: ${copiedFiles.join(", ")}`);
+	// 汇总后一次性输出，避免逐行写入控制台
+	const logLines = [
+		`[formify] Source: ${sourceDir}`,
+		`[formify] Vault: ${vaultRoot}`,
+		`[formify] Plugin id: ${pluginId}`,
+		`[formify] Target: ${targetPluginDir}`,
+		`[formify] Copy: ${copiedFiles.join(", ") || "(none)"}`
+	];
+	if (skippedFiles.length > 0) {
+		logLines.push(`[formify] Unchanged: ${skippedFiles.join(", ")}`);
+	}
+	console.log(logLines.join("\n"));
 
 	return {
 		pluginId,
 		sourceDir,
 		targetPluginDir,
-		copiedFiles
+		copiedFiles,
+		skippedFiles,
+		copiedBytes
 	};
 }
 
+/**
+ * 解析命令行参数为 copyToVault 选项
+ * --vault <path> 覆盖 OBSIDIAN_VAULT_PATH，--force 忽略未变化检查强制复制
+ */
+export function parseCopyOptions(args = process.argv.slice(2)) {
+	const { values } = parseArgs({
+		args,
+		options: {
+			vault: { type: "string" },
+			force: { type: "boolean", default: false }
+		}
+	});
+	return { vaultPath: values.vault, force: values.force };
+}
+
 const isDirectRun =
 	process.argv[1] && resolve(process.argv[1]) === resolve(fileURLToPath(import.meta.url));
 
 if (isDirectRun) {
 	try {
-		await copyToVault();
+		await copyToVault(parseCopyOptions());
 	} catch (error) {
 		console.error(`[formify] Copy failed: ${error.message}`);
 		process.exit(1);
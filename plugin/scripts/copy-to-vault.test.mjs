@@ -0,0 +1,153 @@
+import { after, before, describe, it } from "node:test";
+import assert from "node:assert/strict";
+import { mkdir, mkdtemp, readFile, rm, stat, symlink, utimes, writeFile } from "node:fs/promises";
+import { tmpdir } from "node:os";
+import { join } from "node:path";
+import { isSameFile, isTargetUpToDate, parseCopyOptions, syncBuildFile } from "./copy-to-vault.mjs";
+
+let workDir;
+
+before(async () => {
+	workDir = await mkdtemp(join(tmpdir(), "formify-copy-to-vault-"));
+});
+
+after(async () => {
+	await rm(workDir, { recursive: true, force: true });
+});
+
+async function createFile(name, content, mtimeSeconds) {
+	const filePath = join(workDir, name);
+	await writeFile(filePath, content);
+	if (mtimeSeconds !== undefined) {
+		await utimes(filePath, mtimeSeconds, mtimeSeconds);
+	}
+	return { filePath, fileStat: await stat(filePath) };
+}
+
+// Windows 未开启开发者模式时无权创建符号链接，此时跳过依赖符号链接的用例
+async function trySymlink(t, targetPath, linkPath) {
+	try {
+		await symlink(targetPath, linkPath);
+		return true;
+	} catch (error) {
+		if (error.code === "EPERM") {
+			t.skip("symlink creation is not permitted");
+			return false;
+		}
+		throw error;
+	}
+}
+
+describe("parseCopyOptions", () => {
+	it("should default to env vault and no force", () => {
+		assert.deepEqual(parseCopyOptions([]), { vaultPath: undefined, force: false });
+	});
+
+	it("should read --vault and --force", () => {
+		assert.deepEqual(
+			parseCopyOptions(["--vault", "/tmp/vault", "--force"]),
+			{ vaultPath: "/tmp/vault", force: true }
+		);
+	});
+
+	it("should reject unknown flags", () => {
+		assert.throws(() => parseCopyOptions(["--bogus"]), { code: "ERR_PARSE_ARGS_UNKNOWN_OPTION" });
+	});
+});
+
+describe("isTargetUpToDate", () => {
+	it("should report a missing target as stale", async () => {
+		const source = await createFile("missing-src.js", "a");
+		assert.equal(await isTargetUpToDate(source.filePath, source.fileStat, join(workDir, "nope.js"), null), false);
+	});
+
+	it("should report a size mismatch as stale", async () => {
+		const source = await createFile("size-src.js", "abc", 1_700_000_000);
+		const target = await createFile("size-dst.js", "ab", 1_700_000_000);
+		assert.equal(await isTargetUpToDate(source.filePath, source.fileStat, target.filePath, target.fileStat), false);
+	});
+
+	it("should treat equal size and mtime as up to date", async () => {
+		const source = await createFile("mtime-src.js", "abc", 1_700_000_000);
+		const target = await createFile("mtime-dst.js", "xyz", 1_700_000_000);
+		assert.equal(await isTargetUpToDate(source.filePath, source.fileStat, target.filePath, target.fileStat), true);
+	});
+
+	it("should compare content when mtimes differ without touching the target", async () => {
+		const source = await createFile("content-src.css", "body{}", 1_700_000_000);
+		const target = await createFile("content-dst.css", "body{}", 1_600_000_000);
+		assert.equal(await isTargetUpToDate(source.filePath, source.fileStat, target.filePath, target.fileStat), true);
+		assert.equal((await stat(target.filePath)).mtimeMs, target.fileStat.mtimeMs);
+	});
+
+	it("should report differing content as stale", async () => {
+		const source = await createFile("diff-src.css", "body{}", 1_700_000_000);
+		const target = await createFile("diff-dst.css", "html{}", 1_600_000_000);
+		assert.equal(await isTargetUpToDate(source.filePath, source.fileStat, target.filePath, target.fileStat), false);
+	});
+});
+
+describe("isSameFile", () => {
+	it("should detect a target reached through a symlink", async (t) => {
+		const source = await createFile("same-src.js", "a");
+		const linkPath = join(workDir, "same-link.js");
+		if (!(await trySymlink(t, source.filePath, linkPath))) {
+			return;
+		}
+		assert.equal(await isSameFile(source.filePath, source.fileStat, linkPath, await stat(linkPath)), true);
+	});
+
+	it("should not match distinct files or a missing target", async () => {
+		const source = await createFile("distinct-src.js", "a");
+		const target = await createFile("distinct-dst.js", "a");
+		assert.equal(await isSameFile(source.filePath, source.fileStat, target.filePath, target.fileStat), false);
+		assert.equal(await isSameFile(source.filePath, source.fileStat, join(workDir, "nope.js"), null), false);
+	});
+});
+
+describe("syncBuildFile", () => {
+	async function setupBuildFile(name) {
+		const source = await createFile(`build-${name}`, "console.log(1);", 1_700_000_000);
+		const targetDir = join(workDir, `vault-${name}`);
+		await mkdir(targetDir, { recursive: true });
+		return { file: { name, sourcePath: source.filePath, sourceStat: source.fileStat }, targetDir };
+	}
+
+	it("should copy first, then skip an unchanged target", async () => {
+		const { file, targetDir } = await setupBuildFile("main.js");
+		assert.equal((await syncBuildFile(file, targetDir)).copied, true);
+		assert.equal(await readFile(join(targetDir, "main.js"), "utf8"), "console.log(1);");
+		assert.equal((await syncBuildFile(file, targetDir)).copied, false);
+	});
+
+	it("should refresh the target timestamp when only the content matches", async () => {
+		const { file, targetDir } = await setupBuildFile("versions.json");
+		await writeFile(join(targetDir, "versions.json"), "console.log(1);");
+		assert.equal((await syncBuildFile(file, targetDir)).copied, false);
+		const refreshed = await stat(join(targetDir, "versions.json"));
+		assert.ok(Math.abs(refreshed.mtimeMs - file.sourceStat.mtimeMs) < 1);
+	});
+
+	it("should still report an unchanged target when the timestamp refresh fails", async () => {
+		const { file, targetDir } = await setupBuildFile("locked.js");
+		await writeFile(join(targetDir, "locked.js"), "console.log(1);");
+		const lockedUtimes = async () => {
+			throw Object.assign(new Error("resource busy or locked"), { code: "EBUSY" });
+		};
+		assert.equal((await syncBuildFile(file, targetDir, false, lockedUtimes)).copied, false);
+	});
+
+	it("should copy an unchanged target when forced", async () => {
+		const { file, targetDir } = await setupBuildFile("styles.css");
+		await syncBuildFile(file, targetDir);
+		assert.equal((await syncBuildFile(file, targetDir, true)).copied, true);
+	});
+
+	it("should skip a target that is the source itself even when forced", async (t) => {
+		const { file, targetDir } = await setupBuildFile("manifest.json");
+		if (!(await trySymlink(t, file.sourcePath, join(targetDir, "manifest.json")))) {
+			return;
+		}
+		assert.equal((await syncBuildFile(file, targetDir, true)).copied, false);
+	});
+});
@@ -411,6 +411,42 @@ describe('createFilesystemBuiltinRuntime', () => {
 		await runtime.close();
 	});
 
+	it('should format list_directory sizes at unit boundaries', async () => {
+		const app = new MockApp() as any;
+		app.addFile('sizes/zero.bin', '', { stat: { size: 0 } });
+		app.addFile('sizes/bytes.bin', '', { stat: { size: 1023 } });
+		app.addFile('sizes/one-kb.bin', '', { stat: { size: 1024 } });
+		app.addFile('sizes/below-mb.bin', '', { stat: { size: 1024 * 1024 - 1 } });
+		app.addFile('sizes/one-mb.bin', '', { stat: { size: 1024 * 1024 } });
+		app.addFile('sizes/invalid.bin', '', { stat: { size: Number.NaN } });
+		app.addFile('sizes/infinite.bin', '', { stat: { size: Number.POSITIVE_INFINITY } });
+
+		const runtime = await createFilesystemBuiltinRuntime(app);
+
+		const sized = parseJson<{
+			items: Array<{ name: string; sizeText: string | null }>;
+		}>(
+			await runtime.callTool('list_directory', {
+				directory_path: 'sizes',
+				include_sizes: true,
+			})
+		);
+		const sizeTextByName = Object.fromEntries(
+			sized.items.map((item) => [item.name, item.sizeText])
+		);
+		expect(sizeTextByName).toEqual({
+			'zero.bin': '0 B',
+			'bytes.bin': '1023 B',
+			'one-kb.bin': '1.00 KB',
+			'below-mb.bin': '1024.00 KB',
+			'one-mb.bin': '1.00 MB',
+			'invalid.bin': '0 B',
+			'infinite.bin': '0 B',
+		});
+
+		await runtime.close();
+	});
+
 	it('should paginate read_file segments and suggest the next call for long content', async () => {
 		const app = new MockApp() as any;
 		app.addFile('notes/long.md', 'line 1\nline 2\nline 3\nline 4\nline 5');
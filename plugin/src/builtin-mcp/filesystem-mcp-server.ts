@@ -622,19 +622,23 @@ const toRelativeChildPath = (basePath: string, childPath: string): string => {
 		: childPath;
 };
 
+const SIZE_UNITS = ['B', 'KB', 'MB', 'GB', 'TB'] as const;
+
 const formatSize = (bytes: number): string => {
-	const units = ['B', 'KB', 'MB', 'GB', 'TB'];
 	if (!Number.isFinite(bytes) || bytes <= 0) {
 		return '0 B';
 	}
-	const unitIndex = Math.min(
-		Math.floor(Math.log(bytes) / Math.log(1024)),
-		units.length - 1
-	);
-	if (unitIndex <= 0) {
+	// 用整数阈值比较选择单位，避免浮点对数在边界值上的舍入误差
+	let unitIndex = 0;
+	let unitBytes = 1;
+	while (unitIndex < SIZE_UNITS.length - 1 && bytes >= unitBytes * 1024) {
+		unitBytes *= 1024;
+		unitIndex++;
+	}
+	if (unitIndex === 0) {
 		return `${bytes} B`;
 	}
-	return `${(bytes / Math.pow(1024, unitIndex)).toFixed(2)} ${units[unitIndex]}`;
+	return `${(bytes / unitBytes).toFixed(2)} ${SIZE_UNITS[unitIndex]}`;
 };
 
 const normalizeLineEndings = (text: string): string => text.replace(/\r\n/g, '\n');